@@ -1,15 +1,23 @@
 import streamlit as st
 import joblib
+import json
+import os
+import sys
 import pandas as pd
 import numpy as np
-import re
-import nltk
 import random
 import plotly.express as px
 import seaborn as sns
 import matplotlib.pyplot as plt
-from nltk.stem import WordNetLemmatizer
-from nltk.corpus import stopwords
+from pipeline import CLASSES, clean_text, load_nltk_resources
+
+# files/ modules import each other by top-level name; share that path so
+# instrumentation is only ever loaded as one module
+# (Streamlit re-runs this script on every interaction, so only add it once)
+FILES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'files')
+if FILES_DIR not in sys.path:
+    sys.path.append(FILES_DIR)
+import instrumentation
 
 # --- Page Config & Theme ---
 st.set_page_config(page_title="MindGuard AI Pro", page_icon="🌱", layout="wide")
@@ -35,20 +43,20 @@ def load_all_assets():
         "Random Forest": joblib.load('models/random_forest.pkl')
     }
     tfidf = joblib.load('models/tfidf_vectorizer.pkl')
-    nltk.download('stopwords', quiet=True)
-    nltk.download('wordnet', quiet=True)
+    load_nltk_resources()
     return models, tfidf
 
-models, tfidf = load_all_assets()
-lemmatizer = WordNetLemmatizer()
-stop_words = set(stopwords.words('english'))
-classes = ['Anxiety', 'Depression', 'Normal', 'Suicidal']
+@st.cache_data
+def load_metrics():
+    # Written by train.py next to the models; empty until a model has been trained
+    if not os.path.exists('models/metrics.json'):
+        return {}
+    with open('models/metrics.json') as f:
+        return json.load(f)
 
-# --- Logic: Text Cleaning ---
-def clean_text(text):
-    text = re.sub(r'[^a-zA-Z\s]', '', str(text).lower())
-    tokens = text.split()
-    return " ".join([lemmatizer.lemmatize(w) for w in tokens if w not in stop_words])
+models, tfidf = load_all_assets()
+metrics_report = load_metrics()
+classes = CLASSES
 
 # --- Logic: Infinite Scenario Generator ---
 def generate_random_scenario(category):
@@ -101,10 +109,14 @@ with tab1:
         if st.button("Analyze Statement"):
             if user_input.strip():
                 # Prediction Logic
-                cleaned = clean_text(user_input)
-                vec = tfidf.transform([cleaned])
-                result_idx = models[selected_model].predict(vec)[0]
+                with instrumentation.stage('clean_text'):
+                    cleaned = clean_text(user_input)
+                with instrumentation.stage('tfidf_transform'):
+                    vec = tfidf.transform([cleaned])
+                with instrumentation.stage('predict', engine=selected_model):
+                    result_idx = models[selected_model].predict(vec)[0]
                 result = classes[result_idx]
+                instrumentation.inc('predictions', engine=selected_model, label=result)
                 st.session_state.last_result = result
                 
                 # Visual Result
@@ -159,11 +171,23 @@ with tab2:
     # Metrics Section
     st.divider()
     st.subheader("Accuracy & Metrics")
+    ensemble = metrics_report.get('metrics', {}).get("Consensus (Ensemble)")
     m1, m2, m3, m4 = st.columns(4)
-    m1.metric("Ensemble Accuracy", "88.4%")
-    m2.metric("Weighted Precision", "0.89")
-    m3.metric("Recall (Crisis)", "0.91")
-    m4.metric("F1-Score", "0.88")
+    if ensemble:
+        m1.metric("Ensemble Accuracy", f"{ensemble['accuracy']:.1%}")
+        m2.metric("Weighted Precision", f"{ensemble['precision_weighted']:.2f}")
+        m3.metric("Recall (Crisis)", f"{ensemble['recall_suicidal']:.2f}")
+        m4.metric("F1-Score", f"{ensemble['f1_weighted']:.2f}")
+        st.caption(f"Model version {metrics_report['version']} | "
+                   f"{metrics_report['folds']}-fold cross-validation on {metrics_report['n_documents']} statements")
+    else:
+        for col, label in zip([m1, m2, m3, m4], ["Ensemble Accuracy", "Weighted Precision", "Recall (Crisis)", "F1-Score"]):
+            col.metric(label, "N/A")
+        st.caption("No cross-validated metrics found. Run `python train.py <data.csv>` to compute them.")
+
+    # Runtime Metrics Section
+    with st.expander("Runtime Metrics (Prometheus format)"):
+        st.code(instrumentation.render(), language="text")
 
 # Footer
 st.divider()
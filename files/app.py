@@ -3,18 +3,101 @@ Web Interface for Suicide Risk Analyzer
 Flask application with user-friendly interface
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, g, url_for
+import atexit
 import os
+import signal
+import sys
+import time
 from suicide_risk_analyzer import SuicideRiskAnalyzer
+from config import INSTRUMENTATION_CONFIG, JOB_QUEUE_CONFIG, WEB_APP_CONFIG
+from job_queue import JobError, JobQueue, QueueFullError, WorkerPool
+import instrumentation
 from datetime import datetime
 import json
 
 app = Flask(__name__)
 
+instrumentation.profiler.configure(
+    enabled=INSTRUMENTATION_CONFIG['profile_slow_requests'],
+    threshold=INSTRUMENTATION_CONFIG['slow_request_seconds'],
+    interval=INSTRUMENTATION_CONFIG['sample_interval'],
+    directory=INSTRUMENTATION_CONFIG['profile_directory']
+)
+
 # Initialize analyzer
 api_key = os.getenv('GOOGLE_API_KEY')
 analyzer = SuicideRiskAnalyzer(api_key) if api_key else None
 
+def build_result(user_text):
+    """Run an analysis and attach recommendations and resources"""
+    # Perform analysis
+    analysis = analyzer.analyze_text(user_text)
+    
+    # Get recommendations
+    with instrumentation.stage('recommendations'):
+        recommendations = analyzer.get_recommendations(analysis.get('risk_level', 'moderate'))
+    
+    # Combine results
+    return {
+        **analysis,
+        'recommendations': recommendations,
+        'resources': analyzer.resources
+    }
+
+def run_job(user_text):
+    """Worker handler: fail on analysis errors and keep the input text out of results"""
+    result = build_result(user_text)
+    if 'error' in result:
+        raise JobError(result['error'])
+    result.pop('original_text', None)
+    return result
+
+# Asynchronous jobs: persistent queue drained by a worker pool
+job_queue = JobQueue(
+    JOB_QUEUE_CONFIG['database'],
+    max_depth=JOB_QUEUE_CONFIG['max_depth'],
+    result_ttl=JOB_QUEUE_CONFIG['result_ttl'],
+    lease=JOB_QUEUE_CONFIG['job_lease']
+)
+workers = WorkerPool(
+    job_queue, run_job,
+    workers=JOB_QUEUE_CONFIG['workers'],
+    poll_interval=JOB_QUEUE_CONFIG['poll_interval']
+)
+if analyzer:
+    workers.start()
+    atexit.register(workers.stop, JOB_QUEUE_CONFIG['shutdown_timeout'])
+
+@app.before_request
+def start_request_timer():
+    """Start timing (and optionally profiling) the request"""
+    g.request_start = time.perf_counter()
+    g.request_profile = instrumentation.profiler.profile(request.endpoint or request.path)
+    g.request_profile.__enter__()
+
+@app.after_request
+def record_request_metrics(response):
+    """Record request latency and status code"""
+    endpoint = request.endpoint or 'unknown'
+    if endpoint != 'metrics':
+        instrumentation.observe('http_request_duration_seconds',
+                                time.perf_counter() - g.request_start, endpoint=endpoint)
+        instrumentation.inc('http_requests', endpoint=endpoint, status=response.status_code)
+    return response
+
+@app.teardown_request
+def stop_request_profile(exc):
+    """Stop the sampling profiler; dumps stacks if the request was slow"""
+    profile = g.pop('request_profile', None)
+    if profile is not None:
+        profile.__exit__(None, None, None)
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics endpoint"""
+    return Response(instrumentation.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/')
 def index():
     """Render the main page"""
@@ -38,20 +121,33 @@ def analyze():
             'message': 'Please enter some text to analyze'
         }), 400
     
-    # Perform analysis
-    analysis = analyzer.analyze_text(user_text)
-    
-    # Get recommendations
-    recommendations = analyzer.get_recommendations(analysis.get('risk_level', 'moderate'))
+    if data.get('async') in (True, 'true', '1') or request.args.get('async') in ('true', '1'):
+        try:
+            job_id = job_queue.enqueue(user_text)
+        except QueueFullError:
+            instrumentation.inc('jobs_rejected')
+            response = jsonify({
+                'error': 'Too many pending analyses',
+                'message': 'Please try again shortly'
+            })
+            response.headers['Retry-After'] = '5'
+            return response, 429
+        workers.notify()
+        status_url = url_for('job_status', job_id=job_id)
+        return jsonify({'job_id': job_id, 'status': 'queued', 'status_url': status_url}), 202, {'Location': status_url}
     
-    # Combine results
-    result = {
-        **analysis,
-        'recommendations': recommendations,
-        'resources': analyzer.resources
-    }
-    
-    return jsonify(result)
+    return jsonify(build_result(user_text))
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Status, and once finished the result, of an asynchronous analysis"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({
+            'error': 'Job not found',
+            'message': 'Unknown or expired job ID'
+        }), 404
+    return jsonify(job), 200 if job['status'] in ('done', 'failed') else 202
 
 @app.route('/resources')
 def resources():
@@ -63,4 +159,12 @@ if __name__ == '__main__':
         print("WARNING: GOOGLE_API_KEY environment variable not set!")
         print("Get your API key from: https://makersuite.google.com/app/apikey")
     
-    app.run(debug=True, port=5000)
+    # SIGTERM exits through atexit so in-flight jobs can finish
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    
+    app.run(
+        host=WEB_APP_CONFIG['host'],
+        port=WEB_APP_CONFIG['port'],
+        debug=WEB_APP_CONFIG['debug'],
+        threaded=True
+    )
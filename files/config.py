@@ -62,12 +62,31 @@ ANALYSIS_SETTINGS = {
 
 # Web Application Settings
 WEB_APP_CONFIG = {
-    'host': '0.0.0.0',
+    'host': '127.0.0.1',  # Loopback only; /jobs and /metrics are unauthenticated
     'port': 5000,
     'debug': False,  # Set to False in production
     'max_text_length': 5000,  # Maximum characters for analysis
 }
 
+# Asynchronous Job Settings (POST /analyze with "async": true)
+JOB_QUEUE_CONFIG = {
+    'database': './jobs.sqlite3',  # SQLite file holding the persistent queue
+    'workers': 4,  # Worker threads draining the queue
+    'max_depth': 100,  # Queued + running jobs before /analyze returns 429
+    'poll_interval': 1.0,  # Seconds an idle worker waits between queue checks
+    'result_ttl': 3600,  # Seconds finished results are kept for polling
+    'job_lease': 600,  # Seconds before a running job is assumed abandoned and requeued
+    'shutdown_timeout': 30,  # Seconds to wait for in-flight jobs on shutdown
+}
+
+# Instrumentation Settings (metrics are served at /metrics)
+INSTRUMENTATION_CONFIG = {
+    'profile_slow_requests': os.getenv('PROFILE_SLOW_REQUESTS', '') == '1',  # Sampling profiler, off by default
+    'slow_request_seconds': 2.0,  # Requests slower than this dump a flame-graph stack file
+    'sample_interval': 0.005,  # Seconds between stack samples
+    'profile_directory': './profiles/'
+}
+
 # Privacy Settings
 PRIVACY_CONFIG = {
     'store_analyses': False,  # Do not store user data by default
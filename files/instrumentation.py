@@ -0,0 +1,267 @@
+"""
+Lightweight instrumentation for the Suicide Risk Analyzer
+In-process counters and latency histograms rendered in the Prometheus text
+format, plus an optional sampling profiler for slow requests.
+
+Only the standard library is used so every entry point can import it.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import ContextDecorator, nullcontext
+from datetime import datetime
+
+PREFIX = 'mindguard_'
+
+# Latency buckets in seconds (Prometheus client defaults)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class MetricsRegistry:
+    """
+    Thread-safe store of counters and histograms keyed by name and labels
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+
+    def describe(self, name, help_text):
+        """Attach a HELP line to a metric"""
+        self._help[PREFIX + name] = help_text
+
+    def inc(self, name, amount=1, **labels):
+        """Increment the counter `name` (the `_total` suffix is added)"""
+        key = (PREFIX + name + '_total', tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        """Record one observation in the histogram `name`"""
+        key = (PREFIX + name, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = [[0] * len(self.buckets), 0, 0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    hist[0][i] += 1
+            hist[1] += 1
+            hist[2] += value
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render(self):
+        """
+        Render every metric in the Prometheus text exposition format
+
+        Returns:
+            str: Exposition text, ready to serve from a /metrics route
+        """
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._histograms.items())
+
+        lines = []
+        described = set()
+
+        def header(name, kind):
+            if name in described:
+                return
+            described.add(name)
+            help_name = name[:-len('_total')] if kind == 'counter' else name
+            if help_name in self._help:
+                lines.append(f"# HELP {name} {self._help[help_name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in counters:
+            header(name, 'counter')
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        for (name, labels), (bucket_counts, count, total) in histograms:
+            header(name, 'histogram')
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', repr(bound)),))} {bucket_count}")
+            lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {count}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Timer(ContextDecorator):
+    """
+    Time a block (or a function, as a decorator) into a latency histogram
+
+    Example:
+        with Timer('stage_duration_seconds', stage='clean_text'):
+            cleaned = clean_text(text)
+    """
+
+    def __init__(self, name, registry=None, **labels):
+        self.name = name
+        self.registry = registry
+        self.labels = labels
+
+    def _recreate_cm(self):
+        # Fresh instance per decorated call so concurrent calls don't share state
+        return Timer(self.name, self.registry, **self.labels)
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.elapsed = time.perf_counter() - self._start
+        (self.registry or registry).observe(self.name, self.elapsed, **self.labels)
+        return False
+
+
+class SamplingProfiler:
+    """
+    Opt-in sampling profiler that dumps collapsed stacks for slow requests
+
+    While enabled, a single daemon thread samples the stacks of every thread
+    inside `profile()` every `interval` seconds. When a profiled block runs
+    longer than `threshold` seconds its samples are written in the folded
+    format read by flamegraph.pl and speedscope. Disabled, `profile()` is a
+    no-op context manager.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.threshold = 1.0
+        self.interval = 0.005
+        self.directory = './profiles/'
+        self._lock = threading.Lock()
+        self._active = {}
+        self._thread = None
+
+    def configure(self, enabled=False, threshold=1.0, interval=0.005, directory='./profiles/'):
+        """
+        Args:
+            enabled: Turn sampling on
+            threshold: Minimum duration (seconds) for a profile to be written
+            interval: Seconds between samples
+            directory: Where `.folded` stack files are written
+        """
+        self.enabled = enabled
+        self.threshold = threshold
+        self.interval = interval
+        self.directory = directory
+        if enabled and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+            self._thread.start()
+
+    def profile(self, name):
+        """Context manager profiling the calling thread under `name`"""
+        if not self.enabled:
+            return nullcontext()
+        return _ProfiledBlock(self, name)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._active:
+                    continue
+                frames = sys._current_frames()
+                for thread_id, stacks in self._active.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        stacks[_collapse(frame)] += 1
+
+    def _start(self, thread_id):
+        with self._lock:
+            self._active[thread_id] = Counter()
+
+    def _stop(self, thread_id):
+        with self._lock:
+            return self._active.pop(thread_id, Counter())
+
+    def _dump(self, name, elapsed, stacks):
+        os.makedirs(self.directory, exist_ok=True)
+        safe_name = ''.join(c if c.isalnum() else '_' for c in name).strip('_') or 'request'
+        filename = os.path.join(
+            self.directory,
+            f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{safe_name}_{int(elapsed * 1000)}ms.folded"
+        )
+        with open(filename, 'w') as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        registry.inc('slow_request_profiles', request=name)
+        return filename
+
+
+class _ProfiledBlock:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.thread_id = threading.get_ident()
+        self.start = time.perf_counter()
+        self.profiler._start(self.thread_id)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        stacks = self.profiler._stop(self.thread_id)
+        if elapsed >= self.profiler.threshold and stacks:
+            self.profiler._dump(self.name, elapsed, stacks)
+        return False
+
+
+def _collapse(frame):
+    """Render a frame chain root-first as `file:function;file:function`"""
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ';'.join(reversed(parts))
+
+
+# Process-wide defaults
+registry = MetricsRegistry()
+profiler = SamplingProfiler()
+
+registry.describe('stage_duration_seconds', 'Latency of each analysis pipeline stage')
+registry.describe('http_request_duration_seconds', 'Latency of HTTP requests by endpoint')
+registry.describe('http_requests', 'HTTP requests by endpoint and status code')
+registry.describe('json_decode_errors', 'Model responses that could not be parsed as JSON')
+registry.describe('analysis_errors', 'Analyses that failed, by exception type')
+registry.describe('analyses', 'Completed analyses by risk level')
+registry.describe('predictions', 'Classifier predictions by engine and class')
+registry.describe('slow_request_profiles', 'Sampling profiles written for slow requests')
+registry.describe('jobs', 'Finished asynchronous jobs by status')
+registry.describe('jobs_rejected', 'Asynchronous jobs refused because the queue was full')
+registry.describe('job_queue_wait_seconds', 'Time asynchronous jobs spent queued before a worker took them')
+
+inc = registry.inc
+observe = registry.observe
+render = registry.render
+
+
+def stage(name, **labels):
+    """Shorthand for timing one pipeline stage into stage_duration_seconds"""
+    return Timer('stage_duration_seconds', stage=name, **labels)
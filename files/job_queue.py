@@ -0,0 +1,323 @@
+"""
+Persistent job queue for asynchronous analyses
+A SQLite-backed priority queue (no external broker) and a thread pool
+that drains it.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import instrumentation
+from config import RISK_LEVELS
+
+logger = logging.getLogger(__name__)
+
+# Higher priority is claimed first; text matching no keyword gets 0
+PRIORITIES = {'severe': 3, 'high': 2, 'moderate': 1, 'low': 0}
+
+
+class QueueFullError(Exception):
+    """Raised when enqueueing would exceed the configured queue depth"""
+
+
+class JobError(Exception):
+    """Raised by a job handler to mark the job as failed with a message"""
+
+
+def keyword_priority(text):
+    """
+    Priority of a text from the risk keywords in config.RISK_LEVELS
+
+    Args:
+        text: The text to be analyzed
+
+    Returns:
+        int: Priority of the most severe level with a keyword hit
+    """
+    lowered = text.lower()
+    for level in sorted(PRIORITIES, key=PRIORITIES.get, reverse=True):
+        if any(keyword in lowered for keyword in RISK_LEVELS.get(level, {}).get('keywords', [])):
+            return PRIORITIES[level]
+    return 0
+
+
+class JobQueue:
+    """
+    Priority job queue stored in a SQLite database
+
+    Jobs move queued -> running -> done/failed. Input text is cleared once a
+    job finishes. Finished jobs expire after `result_ttl` seconds and are
+    purged on the next enqueue or claim. A running job whose lease has run
+    out (its worker process died) is put back in the queue.
+    """
+
+    def __init__(self, path, max_depth=100, result_ttl=3600, lease=600):
+        """
+        Args:
+            path: SQLite database file
+            max_depth: Maximum queued + running jobs before enqueue is refused
+            result_ttl: Seconds finished jobs are kept for polling
+            lease: Seconds a running job may take before it is assumed
+                abandoned and requeued; must exceed the slowest analysis
+        """
+        self.path = path
+        self.max_depth = max_depth
+        self.result_ttl = result_ttl
+        self.lease = lease
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    id TEXT UNIQUE NOT NULL,
+                    status TEXT NOT NULL,
+                    priority INTEGER NOT NULL,
+                    text TEXT,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, priority DESC, seq)")
+            self._expire(conn, time.time())
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        # Overwrite deleted content (cleared text, expired rows) instead of
+        # leaving it readable in free pages
+        conn.execute("PRAGMA secure_delete=ON")
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _expire(self, conn, now):
+        """Purge expired results and requeue running jobs whose lease ran out"""
+        conn.execute(
+            "DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?",
+            (now - self.result_ttl,)
+        )
+        # Only stale rows: another live process may still be running newer ones
+        conn.execute(
+            "UPDATE jobs SET status = 'queued', started_at = NULL WHERE status = 'running' AND started_at < ?",
+            (now - self.lease,)
+        )
+
+    def enqueue(self, text, priority=None):
+        """
+        Add a job to the queue
+
+        Args:
+            text: Text to analyze
+            priority: Explicit priority; defaults to keyword_priority(text)
+
+        Returns:
+            str: The new job ID
+
+        Raises:
+            QueueFullError: If the queue already holds `max_depth` jobs
+        """
+        if priority is None:
+            priority = keyword_priority(text)
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._expire(conn, now)
+                depth = conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')"
+                ).fetchone()[0]
+                if depth >= self.max_depth:
+                    raise QueueFullError(f"Job queue is full ({depth} jobs)")
+                conn.execute(
+                    "INSERT INTO jobs (id, status, priority, text, created_at) VALUES (?, 'queued', ?, ?, ?)",
+                    (job_id, priority, text, now)
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return job_id
+
+    def claim(self):
+        """
+        Atomically take the highest-priority queued job
+
+        Returns:
+            sqlite3.Row or None: The claimed job (id, text, created_at)
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._expire(conn, time.time())
+                job = conn.execute(
+                    "SELECT id, text, created_at FROM jobs WHERE status = 'queued' "
+                    "ORDER BY priority DESC, seq LIMIT 1"
+                ).fetchone()
+                if job is not None:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?",
+                        (time.time(), job['id'])
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return job
+
+    def complete(self, job_id, result):
+        """
+        Store a job's result and drop its input text
+
+        The result is written to disk as given; the handler must not echo
+        the input text back in it.
+        """
+        self._finish(job_id, 'done', result=json.dumps(result))
+
+    def fail(self, job_id, error):
+        """Mark a job as failed"""
+        self._finish(job_id, 'failed', error=str(error))
+
+    def _finish(self, job_id, status, result=None, error=None):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, text = NULL, finished_at = ? WHERE id = ?",
+                (status, result, error, time.time(), job_id)
+            )
+
+    def get(self, job_id):
+        """
+        Look up a job
+
+        Returns:
+            dict or None: Job status, timestamps and result or error;
+                None for unknown or expired jobs
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, status, priority, result, error, created_at, started_at, finished_at "
+                "FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        if row['finished_at'] is not None and row['finished_at'] < time.time() - self.result_ttl:
+            return None
+        job = {
+            'job_id': row['id'],
+            'status': row['status'],
+            'priority': row['priority'],
+            'created_at': row['created_at'],
+            'started_at': row['started_at'],
+            'finished_at': row['finished_at']
+        }
+        if row['status'] == 'done':
+            job['result'] = json.loads(row['result'])
+        elif row['status'] == 'failed':
+            job['error'] = row['error']
+        return job
+
+
+class WorkerPool:
+    """
+    Threads that drain a JobQueue with a handler function
+
+    `stop()` stops claiming new jobs and waits for in-flight jobs to finish;
+    anything still queued stays in the database for the next start.
+    """
+
+    def __init__(self, queue, handler, workers=4, poll_interval=1.0):
+        """
+        Args:
+            queue: The JobQueue to drain
+            handler: Callable taking the job text and returning a JSON-serializable result
+            workers: Number of worker threads
+            poll_interval: Seconds an idle worker waits before checking the queue again
+        """
+        self.queue = queue
+        self.handler = handler
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._stopping = threading.Event()
+        self._wakeup = threading.Event()
+        self._threads = []
+
+    def start(self):
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f'job-worker-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def notify(self):
+        """Wake idle workers after an enqueue"""
+        self._wakeup.set()
+
+    def stop(self, timeout=30):
+        """
+        Stop the pool, letting running jobs finish
+
+        Args:
+            timeout: Seconds to wait for in-flight jobs
+        """
+        self._stopping.set()
+        self._wakeup.set()
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(0, deadline - time.monotonic()))
+        still_running = [t.name for t in self._threads if t.is_alive()]
+        if still_running:
+            logger.warning("Workers still busy after shutdown timeout: %s", ", ".join(still_running))
+        self._threads = []
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                job = self.queue.claim()
+            except sqlite3.Error:
+                logger.exception("Could not claim job")
+                job = None
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+
+            instrumentation.observe('job_queue_wait_seconds', time.time() - job['created_at'])
+            try:
+                self._process(job)
+            except Exception:
+                # Storing the outcome failed (database error, unserializable
+                # result); keep the worker alive and try to mark the job failed
+                logger.exception("Could not record outcome of job %s", job['id'])
+                try:
+                    self.queue.fail(job['id'], "Could not store job result")
+                except Exception:
+                    # Left running; its lease runs out and it is requeued
+                    logger.exception("Could not mark job %s as failed", job['id'])
+                instrumentation.inc('jobs', status='failed')
+
+    def _process(self, job):
+        try:
+            with instrumentation.stage('job'):
+                result = self.handler(job['text'])
+        except JobError as e:
+            logger.warning("Job %s failed: %s", job['id'], e)
+            self.queue.fail(job['id'], e)
+            instrumentation.inc('jobs', status='failed')
+        except Exception as e:
+            logger.exception("Job %s failed", job['id'])
+            self.queue.fail(job['id'], e)
+            instrumentation.inc('jobs', status='failed')
+        else:
+            self.queue.complete(job['id'], result)
+            instrumentation.inc('jobs', status='done')
@@ -0,0 +1,306 @@
+"""
+Report rendering for the Suicide Risk Analyzer
+Text, JSON and HTML reports built from sections precomputed once per
+renderer, with a batch writer that streams reports to a file handle.
+"""
+
+import json
+from html import escape
+
+from config import CRISIS_RESOURCES, SUPPORTIVE_MESSAGES
+
+RULE = '=' * 60
+
+FORMATS = ('text', 'json', 'html')
+
+# Analysis fields copied into JSON reports. original_text is deliberately
+# absent: like the text and HTML formats, reports never echo the user's words
+JSON_FIELDS = (
+    'timestamp', 'risk_level', 'confidence', 'indicators_found', 'reasoning',
+    'immediate_action_needed', 'error'
+)
+
+DEFAULT_SUPPORTIVE_MESSAGE = 'Please know that help is available.'
+
+DISCLAIMER = (
+    "This is an AI-assisted assessment tool and does not replace\n"
+    "professional mental health evaluation. Always consult with\n"
+    "qualified mental health professionals for proper diagnosis\n"
+    "and treatment."
+)
+
+# Recommended actions per risk level; unknown levels fall back to "moderate"
+RECOMMENDATIONS = {
+    "severe": {
+        "action": "IMMEDIATE PROFESSIONAL HELP REQUIRED",
+        "steps": [
+            "Call 988 (Suicide & Crisis Lifeline) immediately",
+            "Go to nearest emergency room",
+            "Call 911 if in immediate danger",
+            "Do not leave the person alone"
+        ],
+        "urgency": "CRITICAL"
+    },
+    "high": {
+        "action": "Urgent professional support needed",
+        "steps": [
+            "Contact a mental health professional today",
+            "Call 988 or crisis hotline for immediate support",
+            "Reach out to trusted friend or family member",
+            "Create a safety plan with professional help"
+        ],
+        "urgency": "HIGH"
+    },
+    "moderate": {
+        "action": "Professional consultation recommended",
+        "steps": [
+            "Schedule appointment with therapist or counselor",
+            "Talk to someone you trust about how you're feeling",
+            "Call crisis hotline if feelings intensify",
+            "Practice self-care and avoid isolation"
+        ],
+        "urgency": "MODERATE"
+    },
+    "low": {
+        "action": "Supportive resources available",
+        "steps": [
+            "Consider talking to a counselor or therapist",
+            "Maintain social connections",
+            "Practice mental health wellness activities",
+            "Know that help is available if needed"
+        ],
+        "urgency": "LOW"
+    }
+}
+
+
+def get_recommendations(risk_level):
+    """
+    Get recommendations based on risk level
+
+    Args:
+        risk_level: The assessed risk level
+
+    Returns:
+        dict: Recommended action, steps and urgency (shared, do not mutate)
+    """
+    return RECOMMENDATIONS.get(risk_level, RECOMMENDATIONS["moderate"])
+
+
+_TEXT_HEAD = f"""
+{RULE}
+SUICIDE RISK ANALYSIS REPORT
+{RULE}
+
+Timestamp: {{timestamp}}
+
+RISK ASSESSMENT:
+- Risk Level: {{risk_level}}
+- Confidence: {{confidence}}%
+- Urgency: {{urgency}}
+
+INDICATORS FOUND:
+"""
+
+_TEXT_BODY = """
+REASONING:
+{reasoning}
+
+SUPPORTIVE MESSAGE:
+{supportive}
+"""
+
+_HTML_SECTION = """<section class="report risk-{level}">
+<h2>Risk Level: {risk_level}</h2>
+<dl>
+<dt>Timestamp</dt><dd>{timestamp}</dd>
+<dt>Confidence</dt><dd>{confidence}%</dd>
+<dt>Urgency</dt><dd>{urgency}</dd>
+</dl>
+<h3>Indicators Found</h3>
+<ul>{indicators}</ul>
+<h3>Reasoning</h3>
+<p>{reasoning}</p>
+<h3>Supportive Message</h3>
+<p>{supportive}</p>
+"""
+
+
+class ReportRenderer:
+    """
+    Renders analyses as reports
+
+    Everything that depends only on the risk level (recommendations,
+    crisis resources, disclaimer) is rendered once in __init__; per-analysis
+    work is limited to filling a handful of fields.
+    """
+
+    def __init__(self, resources=CRISIS_RESOURCES, supportive_messages=SUPPORTIVE_MESSAGES):
+        """
+        Args:
+            resources: Crisis resources with "emergency", "websites" and
+                optionally "professional" entries
+            supportive_messages: Fallback supportive message per risk level
+        """
+        self.resources = resources
+        self.supportive_messages = supportive_messages
+
+        text_resources = self._text_resources()
+        html_resources = self._html_resources()
+        self._text_tail = {
+            level: self._text_recommendations(rec) + text_resources
+            for level, rec in RECOMMENDATIONS.items()
+        }
+        self._html_recommendations = {
+            level: self._html_recommendations_block(rec) for level, rec in RECOMMENDATIONS.items()
+        }
+        self._html_head = (
+            '<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="utf-8">\n'
+            '<title>Suicide Risk Analysis Reports</title>\n</head>\n<body>\n'
+            '<h1>Suicide Risk Analysis Reports</h1>\n'
+        )
+        self._html_foot = html_resources + '</body>\n</html>\n'
+        self._json_head = (
+            '{"resources": ' + json.dumps(resources)
+            + ', "disclaimer": ' + json.dumps(DISCLAIMER.replace('\n', ' '))
+            + ', "reports": ['
+        )
+
+    # --- Precomputed sections ---
+    @staticmethod
+    def _text_recommendations(rec):
+        steps = ''.join(f"  {step}\n" for step in rec['steps'])
+        return f"\n{RULE}\nRECOMMENDATIONS: {rec['action']}\n{RULE}\n{steps}"
+
+    def _text_resources(self):
+        emergency = ''.join(f"  {location}: {number}\n" for location, number in self.resources['emergency'].items())
+        websites = ''.join(f"  • {website}\n" for website in self.resources['websites'])
+        section = f"\n{RULE}\nCRISIS RESOURCES:\n{RULE}\n{emergency}\nAdditional Resources:\n{websites}"
+        if self.resources.get('professional'):
+            section += "\nProfessional Support:\n" + ''.join(
+                f"  • {item}\n" for item in self.resources['professional']
+            )
+        return section + f"\n{RULE}\nIMPORTANT DISCLAIMER:\n{DISCLAIMER}\n{RULE}\n"
+
+    @staticmethod
+    def _html_recommendations_block(rec):
+        steps = ''.join(f"<li>{escape(step)}</li>" for step in rec['steps'])
+        return f"<h3>Recommendations: {escape(rec['action'])}</h3>\n<ol>{steps}</ol>\n</section>\n"
+
+    def _html_resources(self):
+        emergency = ''.join(
+            f"<li>{escape(location)}: {escape(number)}</li>"
+            for location, number in self.resources['emergency'].items()
+        )
+        websites = ''.join(
+            f'<li><a href="{escape(site)}">{escape(site)}</a></li>' for site in self.resources['websites']
+        )
+        professional = ''.join(f"<li>{escape(item)}</li>" for item in self.resources.get('professional', []))
+        section = f"<section class=\"resources\">\n<h2>Crisis Resources</h2>\n<ul>{emergency}</ul>\n"
+        section += f"<h3>Additional Resources</h3>\n<ul>{websites}</ul>\n"
+        if professional:
+            section += f"<h3>Professional Support</h3>\n<ul>{professional}</ul>\n"
+        return section + f"</section>\n<footer><p>{escape(DISCLAIMER)}</p></footer>\n"
+
+    # --- Per-analysis rendering ---
+    def _fields(self, analysis):
+        # Model output is untrusted; normalize so every format can render it
+        risk_level = str(analysis.get('risk_level', 'unknown'))
+        level = risk_level if risk_level in RECOMMENDATIONS else 'moderate'
+        supportive = analysis.get('supportive_response') or self.supportive_messages.get(
+            risk_level, DEFAULT_SUPPORTIVE_MESSAGE
+        )
+        return risk_level, level, supportive
+
+    def _text_pieces(self, analysis):
+        risk_level, level, supportive = self._fields(analysis)
+        yield _TEXT_HEAD.format(
+            timestamp=analysis.get('timestamp', 'N/A'),
+            risk_level=risk_level.upper(),
+            confidence=analysis.get('confidence', 'N/A'),
+            urgency=RECOMMENDATIONS[level]['urgency']
+        )
+        yield ''.join(f"  • {indicator}\n" for indicator in analysis.get('indicators_found', []))
+        yield _TEXT_BODY.format(reasoning=analysis.get('reasoning', 'N/A'), supportive=supportive)
+        yield self._text_tail[level]
+
+    def _html_pieces(self, analysis):
+        risk_level, level, supportive = self._fields(analysis)
+        yield _HTML_SECTION.format(
+            level=level,
+            risk_level=escape(risk_level.upper()),
+            timestamp=escape(str(analysis.get('timestamp', 'N/A'))),
+            confidence=escape(str(analysis.get('confidence', 'N/A'))),
+            urgency=RECOMMENDATIONS[level]['urgency'],
+            indicators=''.join(f"<li>{escape(str(i))}</li>" for i in analysis.get('indicators_found', [])),
+            reasoning=escape(str(analysis.get('reasoning', 'N/A'))),
+            supportive=escape(str(supportive))
+        )
+        yield self._html_recommendations[level]
+
+    def _json_report(self, analysis):
+        risk_level, level, supportive = self._fields(analysis)
+        report = {field: analysis[field] for field in JSON_FIELDS if field in analysis}
+        report['supportive_response'] = supportive
+        report['recommendations'] = RECOMMENDATIONS[level]
+        return json.dumps(report)
+
+    def render(self, analysis, fmt='text'):
+        """
+        Render a single report
+
+        Args:
+            analysis: The analysis results
+            fmt: One of FORMATS
+
+        Returns:
+            str: Formatted report
+        """
+        if fmt == 'text':
+            return ''.join(self._text_pieces(analysis))
+        if fmt == 'html':
+            return self._html_head + ''.join(self._html_pieces(analysis)) + self._html_foot
+        if fmt == 'json':
+            return self._json_head + self._json_report(analysis) + ']}'
+        raise ValueError(f"Unknown report format {fmt!r}; expected one of {FORMATS}")
+
+    def write_batch(self, analyses, fh, fmt='text'):
+        """
+        Stream reports for many analyses to an open text file handle
+
+        Reports are written one at a time, so `analyses` may be any iterable
+        (including a generator) and memory use does not grow with its length.
+        HTML and JSON output is a single document with the resources and
+        disclaimer written once.
+
+        Args:
+            analyses: Iterable of analysis results
+            fh: Writable text file handle
+            fmt: One of FORMATS
+
+        Returns:
+            int: Number of reports written
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown report format {fmt!r}; expected one of {FORMATS}")
+
+        count = 0
+        if fmt == 'text':
+            for analysis in analyses:
+                fh.writelines(self._text_pieces(analysis))
+                count += 1
+        elif fmt == 'html':
+            fh.write(self._html_head)
+            for analysis in analyses:
+                fh.writelines(self._html_pieces(analysis))
+                count += 1
+            fh.write(self._html_foot)
+        else:
+            fh.write(self._json_head)
+            for analysis in analyses:
+                if count:
+                    fh.write(', ')
+                fh.write(self._json_report(analysis))
+                count += 1
+            fh.write(']}\n')
+        return count
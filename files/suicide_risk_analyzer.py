@@ -4,9 +4,16 @@ A mental health assessment tool that analyzes text for suicide risk indicators
 """
 
 import os
+import logging
 import google.generativeai as genai
 from datetime import datetime
 import json
+import instrumentation
+from instrumentation import stage
+from config import CRISIS_RESOURCES, RISK_LEVELS
+from report_renderer import ReportRenderer, get_recommendations
+
+logger = logging.getLogger(__name__)
 
 class SuicideRiskAnalyzer:
     def __init__(self, api_key):
@@ -19,18 +26,11 @@ class SuicideRiskAnalyzer:
         genai.configure(api_key=api_key)
         self.model = genai.GenerativeModel('gemini-pro')
         
-        # Mental health resources
-        self.resources = {
-            "emergency": {
-                "US": "988 (Suicide & Crisis Lifeline)",
-                "International": "https://findahelpline.com",
-                "Text": "Text HOME to 741741 (Crisis Text Line)"
-            },
-            "websites": [
-                "https://suicidepreventionlifeline.org",
-                "https://www.opencounseling.com/suicide-hotlines"
-            ]
-        }
+        # Mental health resources (customize in config.py)
+        self.resources = CRISIS_RESOURCES
+        
+        # Static report sections are rendered once here and reused per report
+        self.renderer = ReportRenderer(self.resources)
     
     def analyze_text(self, user_text):
         """
@@ -44,7 +44,47 @@ class SuicideRiskAnalyzer:
         """
         
         # Construct the analysis prompt
-        prompt = f"""
+        with stage('prompt_build'):
+            prompt = self._build_prompt(user_text)
+        
+        try:
+            with stage('generate_content'):
+                response = self.model.generate_content(prompt)
+            
+            # Extract JSON from response
+            with stage('json_extract'):
+                response_text = self._extract_json(response.text)
+            
+            try:
+                with stage('json_loads'):
+                    analysis = json.loads(response_text)
+            except json.JSONDecodeError:
+                instrumentation.inc('json_decode_errors')
+                raise
+            
+            # Add timestamp
+            analysis['timestamp'] = datetime.now().isoformat()
+            analysis['original_text'] = user_text
+            
+            # The level comes from the model; bound the label to the known levels
+            risk_level = analysis.get('risk_level')
+            if not (isinstance(risk_level, str) and risk_level in RISK_LEVELS):
+                risk_level = 'other'
+            instrumentation.inc('analyses', risk_level=risk_level)
+            return analysis
+            
+        except Exception as e:
+            logger.exception("Error during analysis")
+            instrumentation.inc('analysis_errors', type=type(e).__name__)
+            return {
+                "error": str(e),
+                "risk_level": "unknown",
+                "message": "Unable to complete analysis. Please seek professional help if needed."
+            }
+    
+    def _build_prompt(self, user_text):
+        """Build the Gemini prompt for one piece of text"""
+        return f"""
         You are a mental health assessment AI assistant. Analyze the following text for suicide risk indicators.
         
         Assess the text for:
@@ -72,38 +112,19 @@ class SuicideRiskAnalyzer:
         
         Be compassionate, non-judgmental, and err on the side of caution.
         """
-        
-        try:
-            response = self.model.generate_content(prompt)
-            
-            # Extract JSON from response
-            response_text = response.text
-            
-            # Clean up response to extract JSON
-            if "```json" in response_text:
-                json_start = response_text.find("```json") + 7
-                json_end = response_text.find("```", json_start)
-                response_text = response_text[json_start:json_end].strip()
-            elif "```" in response_text:
-                json_start = response_text.find("```") + 3
-                json_end = response_text.find("```", json_start)
-                response_text = response_text[json_start:json_end].strip()
-            
-            analysis = json.loads(response_text)
-            
-            # Add timestamp
-            analysis['timestamp'] = datetime.now().isoformat()
-            analysis['original_text'] = user_text
-            
-            return analysis
-            
-        except Exception as e:
-            print(f"Error during analysis: {e}")
-            return {
-                "error": str(e),
-                "risk_level": "unknown",
-                "message": "Unable to complete analysis. Please seek professional help if needed."
-            }
+    
+    @staticmethod
+    def _extract_json(response_text):
+        """Strip a Markdown code fence from the model response, if present"""
+        if "```json" in response_text:
+            json_start = response_text.find("```json") + 7
+            json_end = response_text.find("```", json_start)
+            response_text = response_text[json_start:json_end].strip()
+        elif "```" in response_text:
+            json_start = response_text.find("```") + 3
+            json_end = response_text.find("```", json_start)
+            response_text = response_text[json_start:json_end].strip()
+        return response_text
     
     def get_recommendations(self, risk_level):
         """
@@ -115,121 +136,36 @@ class SuicideRiskAnalyzer:
         Returns:
             dict: Recommendations and resources
         """
-        recommendations = {
-            "severe": {
-                "action": "IMMEDIATE PROFESSIONAL HELP REQUIRED",
-                "steps": [
-                    "Call 988 (Suicide & Crisis Lifeline) immediately",
-                    "Go to nearest emergency room",
-                    "Call 911 if in immediate danger",
-                    "Do not leave the person alone"
-                ],
-                "urgency": "CRITICAL"
-            },
-            "high": {
-                "action": "Urgent professional support needed",
-                "steps": [
-                    "Contact a mental health professional today",
-                    "Call 988 or crisis hotline for immediate support",
-                    "Reach out to trusted friend or family member",
-                    "Create a safety plan with professional help"
-                ],
-                "urgency": "HIGH"
-            },
-            "moderate": {
-                "action": "Professional consultation recommended",
-                "steps": [
-                    "Schedule appointment with therapist or counselor",
-                    "Talk to someone you trust about how you're feeling",
-                    "Call crisis hotline if feelings intensify",
-                    "Practice self-care and avoid isolation"
-                ],
-                "urgency": "MODERATE"
-            },
-            "low": {
-                "action": "Supportive resources available",
-                "steps": [
-                    "Consider talking to a counselor or therapist",
-                    "Maintain social connections",
-                    "Practice mental health wellness activities",
-                    "Know that help is available if needed"
-                ],
-                "urgency": "LOW"
-            }
-        }
-        
-        return recommendations.get(risk_level, recommendations["moderate"])
+        return get_recommendations(risk_level)
     
-    def generate_report(self, analysis):
+    @stage('report')
+    def generate_report(self, analysis, fmt='text'):
         """
         Generate a comprehensive report from analysis
         
         Args:
             analysis: The analysis results
+            fmt: Report format - 'text', 'json' or 'html'
             
         Returns:
             str: Formatted report
         """
-        risk_level = analysis.get('risk_level', 'unknown')
-        recommendations = self.get_recommendations(risk_level)
-        
-        report = f"""
-{'='*60}
-SUICIDE RISK ANALYSIS REPORT
-{'='*60}
-
-Timestamp: {analysis.get('timestamp', 'N/A')}
-
-RISK ASSESSMENT:
-- Risk Level: {risk_level.upper()}
-- Confidence: {analysis.get('confidence', 'N/A')}%
-- Urgency: {recommendations['urgency']}
-
-INDICATORS FOUND:
-"""
-        
-        for indicator in analysis.get('indicators_found', []):
-            report += f"  • {indicator}\n"
-        
-        report += f"""
-REASONING:
-{analysis.get('reasoning', 'N/A')}
-
-SUPPORTIVE MESSAGE:
-{analysis.get('supportive_response', 'Please know that help is available.')}
-
-{'='*60}
-RECOMMENDATIONS: {recommendations['action']}
-{'='*60}
-"""
-        
-        for step in recommendations['steps']:
-            report += f"  {step}\n"
-        
-        report += f"""
-{'='*60}
-CRISIS RESOURCES:
-{'='*60}
-"""
-        
-        for location, number in self.resources['emergency'].items():
-            report += f"  {location}: {number}\n"
-        
-        report += "\nAdditional Resources:\n"
-        for website in self.resources['websites']:
-            report += f"  • {website}\n"
-        
-        report += f"""
-{'='*60}
-IMPORTANT DISCLAIMER:
-This is an AI-assisted assessment tool and does not replace
-professional mental health evaluation. Always consult with
-qualified mental health professionals for proper diagnosis
-and treatment.
-{'='*60}
-"""
+        return self.renderer.render(analysis, fmt)
+    
+    @stage('report_batch')
+    def write_reports(self, analyses, fh, fmt='text'):
+        """
+        Stream reports for many analyses (e.g. a daily digest) to a file
         
-        return report
+        Args:
+            analyses: Iterable of analysis results
+            fh: Writable text file handle
+            fmt: Report format - 'text', 'json' or 'html'
+            
+        Returns:
+            int: Number of reports written
+        """
+        return self.renderer.write_batch(analyses, fh, fmt)
 
 
 def main():
@@ -0,0 +1,159 @@
+"""
+Tests for the persistent job queue and worker pool
+Run with: python -m pytest test_job_queue.py (or python -m unittest)
+"""
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+
+from job_queue import JobError, JobQueue, QueueFullError, WorkerPool, keyword_priority
+
+
+class JobQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'jobs.sqlite3')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_keyword_priority(self):
+        self.assertEqual(keyword_priority("I want to END MY LIFE"), 3)
+        self.assertEqual(keyword_priority("I feel like a burden"), 2)
+        self.assertEqual(keyword_priority("so alone lately"), 1)
+        self.assertEqual(keyword_priority("nice day"), 0)
+
+    def test_claims_highest_priority_first_then_fifo(self):
+        queue = JobQueue(self.path)
+        low = queue.enqueue("nice day")
+        severe = queue.enqueue("thinking about suicide")
+        moderate = queue.enqueue("I feel isolated")
+        low2 = queue.enqueue("another nice day")
+        claimed = [queue.claim()['id'] for _ in range(4)]
+        self.assertEqual(claimed, [severe, moderate, low, low2])
+        self.assertIsNone(queue.claim())
+
+    def test_rejects_when_full(self):
+        queue = JobQueue(self.path, max_depth=2)
+        queue.enqueue("a")
+        queue.enqueue("b")
+        with self.assertRaises(QueueFullError):
+            queue.enqueue("c")
+        job = queue.claim()
+        queue.complete(job['id'], {})
+        queue.enqueue("c")
+
+    def test_finished_job_drops_text_and_expires(self):
+        queue = JobQueue(self.path, result_ttl=0.05)
+        job_id = queue.enqueue("private text")
+        queue.complete(queue.claim()['id'], {'risk_level': 'low'})
+        self.assertEqual(queue.get(job_id)['result'], {'risk_level': 'low'})
+        with sqlite3.connect(self.path) as conn:
+            self.assertIsNone(conn.execute("SELECT text FROM jobs").fetchone()[0])
+            # Move the WAL into the main file so the check below sees every page
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        with open(self.path, 'rb') as f:
+            self.assertNotIn(b"private text", f.read())
+
+        time.sleep(0.1)
+        self.assertIsNone(queue.get(job_id))
+        queue.claim()
+        with sqlite3.connect(self.path) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0], 0)
+
+    def test_only_stale_running_jobs_are_requeued(self):
+        queue = JobQueue(self.path, lease=60)
+        job_id = queue.enqueue("text")
+        queue.claim()
+        # A second process starting up must not steal a job that is still leased
+        other = JobQueue(self.path, lease=60)
+        self.assertEqual(other.get(job_id)['status'], 'running')
+        self.assertIsNone(other.claim())
+
+        with sqlite3.connect(self.path) as conn:
+            conn.execute("UPDATE jobs SET started_at = ?", (time.time() - 120,))
+        self.assertEqual(other.claim()['id'], job_id)
+
+
+class WorkerPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.queue = JobQueue(os.path.join(self.tmpdir.name, 'jobs.sqlite3'))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def wait_for(self, job_id, timeout=5):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            job = self.queue.get(job_id)
+            if job['status'] in ('done', 'failed'):
+                return job
+            time.sleep(0.01)
+        self.fail(f"Job {job_id} did not finish")
+
+    def test_runs_jobs_and_records_failures(self):
+        def handler(text):
+            if text == 'bad':
+                raise JobError("analysis failed")
+            return {'length': len(text)}
+
+        pool = WorkerPool(self.queue, handler, workers=2, poll_interval=0.01)
+        pool.start()
+        try:
+            good = self.queue.enqueue('good')
+            bad = self.queue.enqueue('bad')
+            pool.notify()
+            self.assertEqual(self.wait_for(good)['result'], {'length': 4})
+            failed = self.wait_for(bad)
+            self.assertEqual(failed['status'], 'failed')
+            self.assertEqual(failed['error'], "analysis failed")
+        finally:
+            pool.stop(5)
+
+    def test_worker_survives_errors_storing_results(self):
+        def handler(text):
+            # A set is not JSON-serializable, so complete() raises
+            return {'bad': {1}} if text == 'unserializable' else {'ok': True}
+
+        pool = WorkerPool(self.queue, handler, workers=1, poll_interval=0.01)
+        pool.start()
+        try:
+            broken = self.queue.enqueue('unserializable')
+            pool.notify()
+            failed = self.wait_for(broken)
+            self.assertEqual(failed['status'], 'failed')
+            self.assertEqual(failed['error'], "Could not store job result")
+
+            later = self.queue.enqueue('fine')
+            pool.notify()
+            self.assertEqual(self.wait_for(later)['result'], {'ok': True})
+            self.assertTrue(all(thread.is_alive() for thread in pool._threads))
+        finally:
+            pool.stop(5)
+
+    def test_stop_drains_in_flight_jobs(self):
+        started = threading.Event()
+
+        def handler(text):
+            started.set()
+            time.sleep(0.2)
+            return {'ok': True}
+
+        pool = WorkerPool(self.queue, handler, workers=1, poll_interval=0.01)
+        pool.start()
+        in_flight = self.queue.enqueue('first')
+        self.assertTrue(started.wait(5))
+        queued = self.queue.enqueue('second')
+        pool.stop(5)
+
+        self.assertEqual(self.queue.get(in_flight)['status'], 'done')
+        self.assertEqual(self.queue.get(queued)['status'], 'queued')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+"""
+Tests for report rendering
+Run with: python -m pytest test_report_renderer.py (or python -m unittest)
+"""
+
+import io
+import json
+import unittest
+
+from report_renderer import FORMATS, ReportRenderer
+
+ANALYSIS = {
+    'risk_level': 'high',
+    'confidence': '70',
+    'indicators_found': ['hopelessness'],
+    'reasoning': 'Expresses hopelessness',
+    'timestamp': '2024-01-01T00:00:00',
+    'original_text': 'MY PRIVATE STATEMENT'
+}
+
+
+class ReportRendererTest(unittest.TestCase):
+    def setUp(self):
+        self.renderer = ReportRenderer()
+
+    def test_reports_never_include_original_text(self):
+        for fmt in FORMATS:
+            self.assertNotIn('MY PRIVATE STATEMENT', self.renderer.render(ANALYSIS, fmt), fmt)
+            buf = io.StringIO()
+            self.renderer.write_batch([ANALYSIS, ANALYSIS], buf, fmt)
+            self.assertNotIn('MY PRIVATE STATEMENT', buf.getvalue(), fmt)
+
+    def test_json_batch_is_one_document(self):
+        buf = io.StringIO()
+        self.renderer.write_batch([ANALYSIS, {'risk_level': 'low'}], buf, 'json')
+        reports = json.loads(buf.getvalue())['reports']
+        self.assertEqual([r['recommendations']['urgency'] for r in reports], ['HIGH', 'LOW'])
+        self.assertEqual(reports[0]['indicators_found'], ['hopelessness'])
+
+    def test_non_string_model_fields_render(self):
+        analysis = {'risk_level': ['low'], 'supportive_response': 7}
+        for fmt in FORMATS:
+            self.assertTrue(self.renderer.render(analysis, fmt))
+
+
+if __name__ == '__main__':
+    unittest.main()
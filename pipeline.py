@@ -0,0 +1,72 @@
+"""
+Shared text pipeline for MindGuard AI
+Text cleaning, label set and the consensus engine used by both
+the Streamlit dashboard (app.py) and the training entry point (train.py)
+"""
+
+import re
+import numpy as np
+import nltk
+from nltk.stem import WordNetLemmatizer
+from nltk.corpus import stopwords
+
+CLASSES = ['Anxiety', 'Depression', 'Normal', 'Suicidal']
+
+_lemmatizer = None
+_stop_words = None
+
+
+def load_nltk_resources():
+    """
+    Download (once) and cache the lemmatizer and stopword list used by clean_text
+    """
+    global _lemmatizer, _stop_words
+    if _lemmatizer is None:
+        nltk.download('stopwords', quiet=True)
+        nltk.download('wordnet', quiet=True)
+        _stop_words = set(stopwords.words('english'))
+        _lemmatizer = WordNetLemmatizer()
+    return _lemmatizer, _stop_words
+
+
+def clean_text(text):
+    """
+    Normalize raw text into the token stream the TF-IDF vectorizer was trained on
+
+    Args:
+        text: Raw user text
+
+    Returns:
+        str: Lower-cased, lemmatized text without stopwords or non-letters
+    """
+    lemmatizer, stop_words = load_nltk_resources()
+    text = re.sub(r'[^a-zA-Z\s]', '', str(text).lower())
+    tokens = text.split()
+    return " ".join([lemmatizer.lemmatize(w) for w in tokens if w not in stop_words])
+
+
+class ConsensusClassifier:
+    """
+    Majority vote over already-fitted engines
+
+    Ties are resolved in favour of the first engine that cast one of the
+    tied votes, so the order of `estimators` sets the priority.
+    """
+
+    def __init__(self, estimators):
+        """
+        Args:
+            estimators: List of (name, fitted model) pairs predicting class indices
+        """
+        self.estimators = estimators
+        self.classes_ = np.arange(len(CLASSES))
+
+    def predict(self, X):
+        votes = np.column_stack([model.predict(X) for _, model in self.estimators]).astype(int)
+        counts = np.zeros((votes.shape[0], len(CLASSES)), dtype=int)
+        for column in votes.T:
+            counts[np.arange(votes.shape[0]), column] += 1
+        best = counts.max(axis=1, keepdims=True)
+        # First vote (in estimator order) that reaches the top count wins
+        winners = counts[np.arange(votes.shape[0])[:, None], votes] == best
+        return votes[np.arange(votes.shape[0]), winners.argmax(axis=1)]
@@ -0,0 +1,398 @@
+"""
+Training entry point for MindGuard AI
+Streams a labeled CSV corpus through clean_text and builds every artifact
+the dashboard loads from models/, together with cross-validated metrics.
+
+Usage:
+    python train.py data.csv --text-column text --label-column status
+"""
+
+import argparse
+import glob
+import json
+import os
+import random
+import shutil
+import tempfile
+from collections import Counter
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score
+
+from pipeline import CLASSES, ConsensusClassifier, clean_text
+
+# Artifact file names expected by app.py, keyed by the dashboard engine name
+MODEL_FILES = {
+    "Consensus (Ensemble)": "consensus_model.pkl",
+    "SVM": "svm_model.pkl",
+    "Logistic Regression": "logistic_regression.pkl",
+    "Random Forest": "random_forest.pkl"
+}
+VECTORIZER_FILE = "tfidf_vectorizer.pkl"
+METRICS_FILE = "metrics.json"
+
+SUICIDAL_IDX = CLASSES.index('Suicidal')
+
+
+# --- Streaming ---
+def encode_labels(labels):
+    """
+    Map raw labels (class names or indices) onto indices into CLASSES
+
+    Args:
+        labels: pandas Series of raw labels
+
+    Returns:
+        np.ndarray: Integer class indices
+    """
+    lookup = {name.lower(): idx for idx, name in enumerate(CLASSES)}
+    lookup.update({str(idx): idx for idx in range(len(CLASSES))})
+    encoded = labels.astype(str).str.strip().str.lower().map(lookup)
+    if encoded.isna().any():
+        unknown = sorted(set(labels[encoded.isna()].astype(str)))[:5]
+        raise ValueError(f"Unknown labels {unknown}; expected one of {CLASSES}")
+    return encoded.to_numpy(dtype=np.int64)
+
+
+def spool_cleaned_corpus(source, spool_dir, text_column, label_column, chunksize, analyzer,
+                         folds=1, buckets=64, seed=42):
+    """
+    Clean the raw corpus chunk by chunk into bucketed spool files and tally the vocabulary
+
+    Every later pass (training epochs, CV folds) reads the spool, so clean_text
+    runs exactly once per document. Rows are scattered across `buckets` files
+    by a seeded random draw so that readers can visit them in shuffled order
+    whatever the ordering of the source file (e.g. one class after another).
+
+    Each row's CV fold (source row index modulo `folds`) is stored with it, and
+    counts are kept per fold so each fold's vectorizer can be built from its
+    training rows only.
+
+    Returns:
+        list: One VocabularyCounts per fold
+    """
+    folds = max(folds, 1)
+    counts = [VocabularyCounts() for _ in range(folds)]
+    rng = np.random.default_rng(seed)
+    n_docs = 0
+    reader = pd.read_csv(
+        source, usecols=[text_column, label_column], chunksize=chunksize,
+        dtype={label_column: str}
+    )
+    for chunk in reader:
+        chunk = chunk.dropna(subset=[text_column, label_column])
+        cleaned = [clean_text(t) for t in chunk[text_column]]
+        labels = encode_labels(chunk[label_column])
+        rows = np.arange(n_docs, n_docs + len(cleaned))
+        for row, doc in zip(rows, cleaned):
+            counts[row % folds].add(analyzer(doc))
+        spooled = pd.DataFrame({'text': cleaned, 'label': labels, 'fold': rows % folds})
+        for bucket, part in spooled.groupby(rng.integers(buckets, size=len(spooled))):
+            path = bucket_path(spool_dir, bucket)
+            part.to_csv(path, mode='a', header=not os.path.exists(path), index=False)
+        n_docs += len(cleaned)
+    if not n_docs:
+        raise ValueError(f"No labeled rows found in {source}")
+    return counts
+
+
+def bucket_path(spool_dir, bucket):
+    return os.path.join(spool_dir, f'bucket_{bucket:04d}.csv')
+
+
+class VocabularyCounts:
+    """
+    Document count, term counts and document frequencies for a set of rows
+    """
+
+    def __init__(self):
+        self.n_docs = 0
+        self.term_counts = Counter()
+        self.doc_freq = Counter()
+
+    def add(self, tokens):
+        self.n_docs += 1
+        self.term_counts.update(tokens)
+        self.doc_freq.update(set(tokens))
+
+    @classmethod
+    def merge(cls, parts):
+        merged = cls()
+        for part in parts:
+            merged.n_docs += part.n_docs
+            merged.term_counts.update(part.term_counts)
+            merged.doc_freq.update(part.doc_freq)
+        return merged
+
+
+def iter_spool(spool_dir, chunksize, rng=None):
+    """
+    Yield (cleaned texts, labels, folds) chunks from the spool buckets
+
+    With `rng`, buckets are visited in a random order and each bucket is
+    loaded and permuted in memory before being cut into chunks, so
+    partial_fit sees classes interleaved. Without it, rows come back in a
+    fixed order (enough for evaluation).
+    """
+    paths = sorted(glob.glob(os.path.join(spool_dir, 'bucket_*.csv')))
+    if rng is not None:
+        paths = [paths[i] for i in rng.permutation(len(paths))]
+    for path in paths:
+        bucket = pd.read_csv(path, keep_default_na=False)
+        if rng is not None:
+            bucket = bucket.iloc[rng.permutation(len(bucket))]
+        for start in range(0, len(bucket), chunksize):
+            chunk = bucket.iloc[start:start + chunksize]
+            yield (
+                chunk['text'].tolist(),
+                chunk['label'].to_numpy(dtype=np.int64),
+                chunk['fold'].to_numpy(dtype=np.int64)
+            )
+
+
+def build_vectorizer(counts, max_features, min_df):
+    """
+    Build a fitted TfidfVectorizer from streamed counts instead of an in-memory fit
+
+    The vocabulary keeps the `max_features` most frequent terms seen in at least
+    `min_df` documents and the IDF weights use scikit-learn's smoothed formula,
+    so the result is equivalent to TfidfVectorizer.fit on the counted rows.
+
+    Args:
+        counts: VocabularyCounts of the rows to fit on
+    """
+    n_docs, term_counts, doc_freq = counts.n_docs, counts.term_counts, counts.doc_freq
+    candidates = [t for t, df in doc_freq.items() if df >= min_df]
+    candidates.sort(key=lambda t: (-term_counts[t], t))
+    terms = sorted(candidates[:max_features])
+    if not terms:
+        raise ValueError("Vocabulary is empty; lower --min-df or provide more data")
+
+    vectorizer = TfidfVectorizer(vocabulary={t: i for i, t in enumerate(terms)})
+    df = np.array([doc_freq[t] for t in terms], dtype=np.float64)
+    vectorizer.idf_ = np.log((1 + n_docs) / (1 + df)) + 1
+    return vectorizer
+
+
+# --- Model fitting ---
+def fit_engines(spool_dir, vectorizer, args, holdout=None, rf_jobs=1):
+    """
+    Fit the three engines with a single shuffled streaming pass per epoch
+
+    SVM and Logistic Regression are trained out-of-core with partial_fit.
+    Random Forest has no incremental mode, so it is fit (in parallel) on a
+    uniform reservoir sample of at most `args.rf_sample` documents.
+
+    Args:
+        spool_dir: Directory of the cleaned corpus spool
+        vectorizer: Fitted TF-IDF vectorizer
+        args: Parsed command line arguments
+        holdout: Optional CV fold index whose rows are skipped
+        rf_jobs: n_jobs for the Random Forest
+
+    Returns:
+        dict: Engine name -> fitted model
+    """
+    label_ids = np.arange(len(CLASSES))
+    svm = SGDClassifier(loss='hinge', alpha=args.alpha, random_state=args.seed)
+    logreg = SGDClassifier(loss='log_loss', alpha=args.alpha, random_state=args.seed)
+    rng = random.Random(args.seed)
+    # Fresh visiting order every epoch; seeded so runs are reproducible
+    shuffle_rng = np.random.default_rng(args.seed)
+    reservoir_text, reservoir_y = [], []
+    seen = 0
+
+    for epoch in range(args.epochs):
+        for texts, y, folds in iter_spool(spool_dir, args.chunksize, rng=shuffle_rng):
+            if holdout is not None:
+                keep = folds != holdout
+                if not keep.any():
+                    continue
+                texts = [t for t, k in zip(texts, keep) if k]
+                y = y[keep]
+
+            X = vectorizer.transform(texts)
+            svm.partial_fit(X, y, classes=label_ids)
+            logreg.partial_fit(X, y, classes=label_ids)
+
+            if epoch == 0:
+                for text, label in zip(texts, y):
+                    seen += 1
+                    if len(reservoir_text) < args.rf_sample:
+                        reservoir_text.append(text)
+                        reservoir_y.append(label)
+                    else:
+                        slot = rng.randrange(seen)
+                        if slot < args.rf_sample:
+                            reservoir_text[slot] = text
+                            reservoir_y[slot] = label
+
+    forest = RandomForestClassifier(
+        n_estimators=args.rf_trees, n_jobs=rf_jobs, random_state=args.seed
+    )
+    forest.fit(vectorizer.transform(reservoir_text), np.array(reservoir_y))
+
+    engines = {"SVM": svm, "Logistic Regression": logreg, "Random Forest": forest}
+    engines["Consensus (Ensemble)"] = ConsensusClassifier(list(engines.items()))
+    return engines
+
+
+def score(y_true, y_pred):
+    """
+    Compute the metrics shown on the dashboard
+    """
+    return {
+        'accuracy': accuracy_score(y_true, y_pred),
+        'precision_weighted': precision_score(y_true, y_pred, average='weighted', zero_division=0),
+        'recall_suicidal': recall_score(
+            y_true, y_pred, labels=[SUICIDAL_IDX], average='macro', zero_division=0
+        ),
+        'f1_weighted': f1_score(y_true, y_pred, average='weighted', zero_division=0)
+    }
+
+
+def evaluate_fold(spool_dir, vectorizer, args, fold):
+    """
+    Train on every fold but `fold` and score each engine on the held-out rows
+    """
+    engines = fit_engines(spool_dir, vectorizer, args, holdout=fold)
+    y_true = []
+    y_pred = {name: [] for name in engines}
+    for texts, y, folds in iter_spool(spool_dir, args.chunksize):
+        mask = folds == fold
+        if not mask.any():
+            continue
+        X = vectorizer.transform([t for t, m in zip(texts, mask) if m])
+        y_true.append(y[mask])
+        for name, model in engines.items():
+            y_pred[name].append(model.predict(X))
+    y_true = np.concatenate(y_true)
+    return {name: score(y_true, np.concatenate(preds)) for name, preds in y_pred.items()}
+
+
+def cross_validate(spool_dir, fold_counts, args):
+    """
+    Run the CV folds in parallel, one worker per fold
+
+    Each fold gets its own vectorizer, built from the counts of its training
+    folds only, so held-out rows never influence the vocabulary or IDF.
+
+    Args:
+        fold_counts: VocabularyCounts per fold from spool_cleaned_corpus
+
+    Returns:
+        dict: Engine name -> metric name -> mean over folds
+    """
+    vectorizers = [
+        build_vectorizer(
+            VocabularyCounts.merge(c for i, c in enumerate(fold_counts) if i != fold),
+            args.max_features, args.min_df
+        )
+        for fold in range(args.folds)
+    ]
+    fold_scores = Parallel(n_jobs=args.n_jobs)(
+        delayed(evaluate_fold)(spool_dir, vectorizers[fold], args, fold) for fold in range(args.folds)
+    )
+    return {
+        name: {
+            metric: float(np.mean([fold[name][metric] for fold in fold_scores]))
+            for metric in fold_scores[0][name]
+        }
+        for name in fold_scores[0]
+    }
+
+
+# --- Artifacts ---
+def save_artifacts(engines, vectorizer, report, output_dir, version):
+    """
+    Write a versioned artifact set and promote it to the paths app.py loads
+
+    Returns:
+        str: Directory holding the versioned artifacts
+    """
+    version_dir = os.path.join(output_dir, version)
+    os.makedirs(version_dir, exist_ok=True)
+
+    for name, filename in MODEL_FILES.items():
+        joblib.dump(engines[name], os.path.join(version_dir, filename))
+    joblib.dump(vectorizer, os.path.join(version_dir, VECTORIZER_FILE))
+    with open(os.path.join(version_dir, METRICS_FILE), 'w') as f:
+        json.dump(report, f, indent=2)
+
+    for filename in list(MODEL_FILES.values()) + [VECTORIZER_FILE, METRICS_FILE]:
+        shutil.copy2(os.path.join(version_dir, filename), os.path.join(output_dir, filename))
+    return version_dir
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Train the MindGuard AI models out-of-core")
+    parser.add_argument('data', help="CSV file with one labeled statement per row")
+    parser.add_argument('--text-column', default='text')
+    parser.add_argument('--label-column', default='label',
+                        help=f"Class names {CLASSES} or their indices")
+    parser.add_argument('--output', default='models')
+    parser.add_argument('--chunksize', type=int, default=10000, help="Rows per streamed chunk")
+    parser.add_argument('--buckets', type=int, default=64,
+                        help="Shuffle buckets; each one (corpus / buckets rows) is loaded into memory")
+    parser.add_argument('--max-features', type=int, default=5000)
+    parser.add_argument('--min-df', type=int, default=2)
+    parser.add_argument('--epochs', type=int, default=5, help="Passes for the linear models")
+    parser.add_argument('--alpha', type=float, default=1e-5, help="SGD regularization strength")
+    parser.add_argument('--rf-trees', type=int, default=200)
+    parser.add_argument('--rf-sample', type=int, default=50000,
+                        help="Reservoir size for the Random Forest training sample")
+    parser.add_argument('--folds', type=int, default=5, help="CV folds (0 to skip)")
+    parser.add_argument('--n-jobs', type=int, default=-1, help="Worker processes (-1 = all cores)")
+    parser.add_argument('--seed', type=int, default=42)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    version = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+    with tempfile.TemporaryDirectory() as workdir:
+        spool_dir = workdir
+        print(f"Cleaning {args.data}...")
+        fold_counts = spool_cleaned_corpus(
+            args.data, spool_dir, args.text_column, args.label_column,
+            args.chunksize, TfidfVectorizer().build_analyzer(),
+            folds=args.folds, buckets=args.buckets, seed=args.seed
+        )
+        counts = VocabularyCounts.merge(fold_counts)
+        n_docs = counts.n_docs
+        vectorizer = build_vectorizer(counts, args.max_features, args.min_df)
+        print(f"{n_docs} documents, {len(vectorizer.vocabulary_)} features")
+
+        metrics = {}
+        if args.folds > 1:
+            print(f"Cross-validating ({args.folds} folds)...")
+            metrics = cross_validate(spool_dir, fold_counts, args)
+
+        print("Fitting final models...")
+        engines = fit_engines(spool_dir, vectorizer, args, rf_jobs=args.n_jobs)
+
+    report = {
+        'version': version,
+        'trained_at': datetime.now().isoformat(),
+        'source': os.path.basename(args.data),
+        'n_documents': n_docs,
+        'n_features': len(vectorizer.vocabulary_),
+        'folds': args.folds if args.folds > 1 else 0,
+        'metrics': metrics
+    }
+    version_dir = save_artifacts(engines, vectorizer, report, args.output, version)
+    print(f"Artifacts saved to: {version_dir}")
+    for name, values in metrics.items():
+        print(f"  {name}: accuracy {values['accuracy']:.3f}, F1 {values['f1_weighted']:.3f}")
+
+
+if __name__ == "__main__":
+    main()